@@ -2,46 +2,54 @@ from Py4GWCoreLib import ConsoleLog
 # =============================
 #  ASCII TREE EXPORTER (Layout E)
 # =============================
+_CONN_LAST = "\\--"
+_CONN_MID = "+--"
+_PAD_LAST = "    "
+_PAD_MID = "|   "
+
+
 def _export_ascii_tree(node, prefix="", is_last=True):
     if node is None:
         return ""
 
     lines = []
 
-    # prefix for connections
-    connector = "\\--" if is_last else "+--"
-
-    # gather basic info
-    name = getattr(node, "name", "<?>")
-    ntype = getattr(node, "node_type", "Node")
-    nid = getattr(node, "node_id", 0)
-    state = getattr(node, "last_state", None)
-
-    # root node has no connector
+    # explicit stack of (node, lead, pad): lead is the text before the node's
+    # own line, pad the prefix its children extend. Both are built once per
+    # parent rather than per child. Root node has no connector.
     if prefix == "":
-        lines.append(f"{ntype}: {name} (ID:{nid}) [{state}]")
+        lead = ""
     else:
-        lines.append(f"{prefix}{connector}{ntype}: {name} (ID:{nid}) [{state}]")
-
-    children = getattr(node, "children", [])
-    if not children:
-        return "\n".join(lines)
-
-    # prepare new prefix for children
-    new_prefix = prefix + ("    " if is_last else "|   ")
-
-    # iterate children
-    total = len(children)
-    for idx, child in enumerate(children):
-        last_child = (idx == total - 1)
-        subtree = _export_ascii_tree(child, new_prefix, last_child)
-        lines.append(subtree)
+        lead = prefix + (_CONN_LAST if is_last else _CONN_MID)
+    stack = [(node, lead, prefix + (_PAD_LAST if is_last else _PAD_MID))]
+    while stack:
+        node, lead, pad = stack.pop()
+
+        # gather basic info
+        name = node.name
+        ntype = node.node_type
+        nid = getattr(node, "node_id", 0)
+        state = node.last_state
+
+        lines.append(f"{lead}{ntype}: {name} (ID:{nid}) [{state}]")
+
+        children = node.children
+        if not children:
+            continue
+
+        # children pushed in reverse so they pop in their natural order
+        last = len(children) - 1
+        stack.append((children[last], pad + _CONN_LAST, pad + _PAD_LAST))
+        mid_lead = pad + _CONN_MID
+        mid_pad = pad + _PAD_MID
+        for idx in range(last - 1, -1, -1):
+            stack.append((children[idx], mid_lead, mid_pad))
 
     return "\n".join(lines)
 
 
 import PyImGui
-from BehaviorTree import NodeState
+from BehaviorTree import Node, NodeState
 
 from Py4GWCoreLib.ImGui_src.IconsFontAwesome5 import IconsFontAwesome5
 
@@ -65,123 +73,197 @@ NODETYPE_COLORS = {
 
 DEFAULT_COLOR = (0.80, 0.80, 0.80, 1.0)
 
+# STATE_COLORS indexed by int(state); slot 0 is "not run yet"
+_STATE_COLOR_TABLE = (
+    STATE_COLORS[None],
+    STATE_COLORS[NodeState.SUCCESS],
+    STATE_COLORS[NodeState.FAILURE],
+    STATE_COLORS[NodeState.RUNNING],
+)
+
+# Icon mapping, resolved once instead of per label build
+_ICON_MAP = {
+    "Selector":   IconsFontAwesome5.ICON_CODE_BRANCH,
+    "Sequence":   IconsFontAwesome5.ICON_STREAM,
+    "Condition":  IconsFontAwesome5.ICON_QUESTION_CIRCLE,
+    "Action":     IconsFontAwesome5.ICON_BOLT,
+    "Subtree":    IconsFontAwesome5.ICON_PROJECT_DIAGRAM,
+}
+
+# State names indexed by int(state), like _STATE_COLOR_TABLE
+_STATE_STR = ("NONE", "SUCCESS", "FAILURE", "RUNNING")
+
 
 
 # =============================
 #  LABEL BUILDER
 # =============================
 def _node_label(node):
-    node_type = getattr(node, "node_type", "Node")
-    name = getattr(node, "name", "<?>")
-    state = getattr(node, "last_state", None)
-    last_ms = getattr(node, "last_duration_ms", 0.0) or 0.0
-    accum_ms = getattr(node, "accumulated_ms", 0.0) or 0.0
-    exec_index = getattr(node, "exec_index", 0)
-    is_active = getattr(node, "is_active_path", False)
-
-    if state == NodeState.SUCCESS:
-        state_str = "SUCCESS"
-    elif state == NodeState.FAILURE:
-        state_str = "FAILURE"
-    elif state == NodeState.RUNNING:
-        state_str = "RUNNING"
-    else:
-        state_str = "NONE"
-
-    # Icon mapping
-    if node_type == "Selector":
-        icon = IconsFontAwesome5.ICON_CODE_BRANCH
-    elif node_type == "Sequence":
-        icon = IconsFontAwesome5.ICON_STREAM
-    elif node_type == "Condition":
-        icon = IconsFontAwesome5.ICON_QUESTION_CIRCLE
-    elif node_type == "Action":
-        icon = IconsFontAwesome5.ICON_BOLT
-    elif node_type == "Subtree":
-        icon = IconsFontAwesome5.ICON_PROJECT_DIAGRAM
+    node_type = node.node_type
+    name = node.name
+    state = node.last_state
+    last_ms = node.last_duration_ms
+    accum_ms = node.accumulated_ms
+    exec_index = node.exec_index
+    is_active = node.is_active_path
+
+    # Reuse last frame's label while the values it shows are unchanged
+    cache_key = (state, exec_index, is_active, last_ms, accum_ms)
+    cached_key, cached = node._label_cache
+    if cached_key == cache_key:
+        return cached
+
+    state_str = _STATE_STR[state or 0]
+
+    icon = _ICON_MAP.get(node_type, "")
+
+    # one f-string per case: appending the execution index afterwards
+    # would copy the whole label a second time
+    if exec_index:
+        label = (
+            f"{icon} [{node_type}] {name} | {state_str} "
+            f"[{last_ms:.3f}ms / {accum_ms:.3f}ms]   #{exec_index}"
+        )
     else:
-        icon = ""
-
-    label = (
-        f"{icon} [{node_type}] {name} | {state_str} "
-        f"[{last_ms:.3f}ms / {accum_ms:.3f}ms]"
-    )
+        label = (
+            f"{icon} [{node_type}] {name} | {state_str} "
+            f"[{last_ms:.3f}ms / {accum_ms:.3f}ms]"
+        )
 
-    # append execution index
-    if exec_index:
-        label = f"{label}   #{exec_index}"
+    # node_type never changes after construction: resolve its color once
+    type_color = node._type_color
+    if type_color is None:
+        type_color = NODETYPE_COLORS.get(node_type, DEFAULT_COLOR)
+        node._type_color = type_color
 
-    type_color = NODETYPE_COLORS.get(node_type, DEFAULT_COLOR)
-    return label, type_color, state_str, last_ms, accum_ms, is_active
+    result = (label, type_color, state_str, last_ms, accum_ms, is_active)
+    node._label_cache = (cache_key, result)
+    return result
 
 
 # =============================
 #  NODE DRAWING
 # =============================
 
-def _ui_push_style_color(color):
-    PyImGui.push_style_color(TEXT_COLOR_IDX, color)
-
-
-def _ui_pop_style_color():
-    PyImGui.pop_style_color(1)
-
-
-def draw_node(node):
-    if node is None:
+def _node_draw_entry(node):
+    """
+    Everything draw_node needs for one node. Node values only change when
+    the tree ticks, so while Node.tick_serial is unchanged (idle tree) the
+    entry built on an earlier frame is returned without touching the node.
+    """
+    serial = Node.tick_serial
+    entry_serial, entry = node._draw_cache
+    if entry_serial == serial:
+        return entry
+
+    info = _node_label(node)
+    # _node_label hands back the same tuple while the values are unchanged
+    if entry is None or entry[0] is not info:
+        label, type_color, state_str, last_ms, accum_ms, is_active = info
+        state = node.last_state
+        state_color = _STATE_COLOR_TABLE[state or 0]
+        # Determine header text color
+        header_color = state_color if is_active else type_color or DEFAULT_COLOR
+        entry = (
+            info,
+            state_color,
+            header_color,
+            f"State: {state_str}",
+            f"Last Duration: {last_ms:.3f} ms",
+            f"Accumulated:  {accum_ms:.3f} ms",
+        )
+    node._draw_cache = (serial, entry)
+    return entry
+
+
+def draw_node(root):
+    if root is None:
         return
 
-    label, type_color, state_str, last_ms, accum_ms, is_active = _node_label(node)
-    state = getattr(node, "last_state", None)
-    state_color = STATE_COLORS.get(state, DEFAULT_COLOR)
-    children = getattr(node, "children", None)
-    has_children = bool(children)
-
-    # Determine header text color
-    header_color = state_color if is_active else type_color or DEFAULT_COLOR
-
-    # Composite nodes
-    if has_children:
-        _ui_push_style_color(header_color)
-        opened = PyImGui.tree_node(label)
-        _ui_pop_style_color()
-    else:
-        # Leaf nodes: no arrow, just colored label
-        if is_active:
-            PyImGui.text_colored(label, state_color)
-        else:
-            PyImGui.text_colored(label, type_color)
-        opened = True  # still show details below
-
-    if opened:
-        # Details (match the style of the reference screenshot)
-        PyImGui.text_colored(f"State: {state_str}", state_color)
-        PyImGui.text(f"Last Duration: {last_ms:.3f} ms")
-        PyImGui.text(f"Accumulated:  {accum_ms:.3f} ms")
-        PyImGui.separator()
-
-        # Visual marker for active nodes
-        if is_active:
-            PyImGui.text_colored("Active this tick", state_color)
-            PyImGui.separator()
-
-        # Draw children inside the same tree node
+    # PyImGui calls run several times per node per frame: resolve them once
+    text = PyImGui.text
+    text_colored = PyImGui.text_colored
+    separator = PyImGui.separator
+    tree_node = PyImGui.tree_node
+    tree_pop = PyImGui.tree_pop
+    push_style_color = PyImGui.push_style_color
+    pop_style_color = PyImGui.pop_style_color
+
+    # explicit stack of (node, phase): phase 0 draws the node, phase 1 closes
+    # the tree_node opened for it once all of its children have been drawn
+    stack = [(root, 0)]
+    while stack:
+        node, phase = stack.pop()
+        if phase:
+            tree_pop()
+            continue
+
+        info, state_color, header_color, state_line, duration_line, accum_line = _node_draw_entry(node)
+        label, type_color, _state_str, _last_ms, _accum_ms, is_active = info
+        children = node.children
+        has_children = bool(children)
+
+        # Composite nodes
         if has_children:
-            for child in children:
-                draw_node(child)
-            PyImGui.tree_pop()
+            push_style_color(TEXT_COLOR_IDX, header_color)
+            opened = tree_node(label)
+            pop_style_color(1)
+        else:
+            # Leaf nodes: no arrow, just colored label
+            if is_active:
+                text_colored(label, state_color)
+            else:
+                text_colored(label, type_color)
+            opened = True  # still show details below
+
+        if opened:
+            # Details (match the style of the reference screenshot)
+            text_colored(state_line, state_color)
+            text(duration_line)
+            text(accum_line)
+            separator()
+
+            # Visual marker for active nodes
+            if is_active:
+                text_colored("Active this tick", state_color)
+                separator()
+
+            # Draw children inside the same tree node
+            if has_children:
+                stack.append((node, 1))
+                for idx in range(len(children) - 1, -1, -1):
+                    stack.append((children[idx], 0))
 
 
 # =============================
 #  MAIN WINDOW
 # =============================
 
+def _reset_accumulated(root):
+    """
+    Zero accumulated_ms below root when profiling resumes, so the total
+    doesn't silently miss the ticks that ran while the window was hidden.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node.accumulated_ms = 0.0
+        node._draw_cache = (None, None)  # cached entry shows the old total
+        stack.extend(node.children)
+
+
 def draw_bt_debugger_ui(root=None):
     if root is None:
         return
 
     PyImGui.set_next_window_size(450, 650)
-    if PyImGui.begin("Behavior Tree Debugger", True):
+    # begin() returns False while the window is collapsed or clipped
+    visible = PyImGui.begin("Behavior Tree Debugger", True)
+    # Durations are only shown here: let ticks skip timing while hidden
+    if visible and not Node.profiling:
+        _reset_accumulated(root)
+    Node.profiling = visible
+    if visible:
         if PyImGui.button("Export BT (ASCII) to Console"):
             txt = _export_ascii_tree(root)
             ConsoleLog("BT_Export", txt)
@@ -6,8 +6,12 @@
 from __future__ import annotations
 
 import time
+from array import array
 from enum import IntEnum
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Tuple, cast
+
+# Bound once; every finished node samples it exactly once.
+_TICK_CLOCK = time.perf_counter
 
 
 # =============================================================
@@ -20,13 +24,79 @@ class NodeState(IntEnum):
     RUNNING = 3
 
 
+# Module-level aliases for the tick hot paths. Reading NodeState.X goes
+# through the enum metaclass on every access; these are plain globals and
+# compare as ints, while still being the NodeState members themselves.
+_S_SUCCESS = NodeState.SUCCESS
+_S_FAILURE = NodeState.FAILURE
+_S_RUNNING = NodeState.RUNNING
+
+
+# =============================================================
+#   Execution path tracking
+#   Plain module functions: the hot paths call these directly
+#   instead of resolving classmethods through type(node).
+# =============================================================
+
+_EXECUTED: List["Node"] = []   # nodes finished this tick, in order
+
+
+def _begin_new_tick(_L=_EXECUTED) -> None:
+    for n in _L:
+        n.is_active_path = False
+        n.exec_index = 0
+    _L.clear()
+    Node.tick_serial += 1
+    Node._last_ts = _TICK_CLOCK()
+
+
+def _register_executed(node: "Node", _L=_EXECUTED) -> None:
+    node.is_active_path = True
+    node.exec_index = len(_L) + 1
+    _L.append(node)
+
+
 # =============================================================
 #   Base Node
 # =============================================================
 
 class Node:
+    __slots__ = (
+        "name",
+        "last_state",
+        "last_duration_ms",
+        "accumulated_ms",
+        "node_type",
+        "is_active_path",
+        "exec_index",
+        "_label_cache",
+        "_type_color",
+        "_draw_cache",
+    )
+
+    # Leaves have no children; composites shadow this with a slot, so
+    # traversals can read node.children on any node without getattr.
+    children: Tuple[Node, ...] = ()
+
     # --- Execution path tracking ---
-    _executed_nodes_last_tick = []
+    _executed_nodes_last_tick = _EXECUTED
+    tick_serial = 0     # bumped by begin_new_tick; lets viewers detect "no tick since"
+
+    # --- Tick clock ---
+    # _last_ts: clock value of the most recent _finish_tick, seeded by
+    # begin_new_tick. Code that ticks a node directly with node.tick() must
+    # call Node.begin_new_tick() first, as BehaviorTree.tick() does;
+    # otherwise the first leaf and its enclosing composites are charged all
+    # the idle time since the previous tick.
+    _last_ts = 0.0
+
+    # --- Profiling ---
+    # When False, ticks skip the clock samples and leave last_duration_ms /
+    # accumulated_ms untouched. BT_DebugUI clears it while its window is
+    # hidden, since nothing else reads the durations, and zeroes
+    # accumulated_ms when it turns it back on: the total then covers the
+    # ticks since the window was last shown, with no hidden gap.
+    profiling = True
 
     def __init__(self, name: str = "Node") -> None:
         self.name: str = name
@@ -36,18 +106,16 @@ class Node:
         self.node_type: str = self.__class__.__name__
         self.is_active_path = False       # bool
         self.exec_index = 0               # int (order of execution this tick)
+        self._label_cache = (None, None)  # (key, label) owned by BT_DebugUI
+        self._type_color = None           # resolved by BT_DebugUI on first draw
+        self._draw_cache = (None, None)   # (tick_serial, draw entry) owned by BT_DebugUI
     @classmethod
     def begin_new_tick(cls):
-        for n in cls._executed_nodes_last_tick:
-            n.is_active_path = False
-            n.exec_index = 0
-        cls._executed_nodes_last_tick.clear()
+        _begin_new_tick()
 
     @classmethod
     def register_executed(cls, node):
-        node.is_active_path = True
-        node.exec_index = len(cls._executed_nodes_last_tick) + 1
-        cls._executed_nodes_last_tick.append(node)
+        _register_executed(node)
 
     @classmethod
     def get_executed_nodes_last_tick(cls):
@@ -56,13 +124,26 @@ class Node:
     def tick(self) -> NodeState:
         raise NotImplementedError("tick() must be implemented by subclasses")
 
-    def _finish_tick(self, state: NodeState, start_time: float) -> NodeState:
-        """Common timing/profiling logic for all nodes."""
+    def _finish_tick(self, state: NodeState, start_time: Optional[float] = None) -> NodeState:
+        """
+        Common timing/profiling logic for all nodes.
+
+        Leaves pass no start_time: their duration is the delta since the
+        previous node finished. Composites pass the Node._last_ts value they
+        saw on entry so their duration spans all of their children. Both
+        are only meaningful after Node.begin_new_tick() started the tick.
+        """
         self.last_state = state
-        end = time.perf_counter()
-        self.last_duration_ms = (end - start_time) * 1000.0
+        if not Node.profiling:
+            _register_executed(self)
+            return state
+        now = _TICK_CLOCK()
+        if start_time is None:
+            start_time = Node._last_ts
+        Node._last_ts = now
+        self.last_duration_ms = (now - start_time) * 1000.0
         self.accumulated_ms += self.last_duration_ms
-        type(self).register_executed(self)
+        _register_executed(self)
         return state
 
 
@@ -71,49 +152,55 @@ class Node:
 # =============================================================
 
 class Sequence(Node):
+    __slots__ = ("children", "index")
+
     def __init__(self, name: str, children: Optional[List[Node]] = None) -> None:
         super().__init__(name)
-        self.children: List[Node] = children or []
+        # frozen: the structure is static once built (see BehaviorTree.compile)
+        self.children: Tuple[Node, ...] = tuple(children) if children else ()
         self.index: int = 0
 
     def tick(self) -> NodeState:
-        start = time.perf_counter()
+        start = Node._last_ts
         while self.index < len(self.children):
             child = self.children[self.index]
             state = child.tick()
 
-            if state == NodeState.RUNNING:
-                return self._finish_tick(NodeState.RUNNING, start)
+            if state == _S_RUNNING:
+                return self._finish_tick(_S_RUNNING, start)
 
-            if state == NodeState.FAILURE:
+            if state == _S_FAILURE:
                 self.index = 0
-                return self._finish_tick(NodeState.FAILURE, start)
+                return self._finish_tick(_S_FAILURE, start)
 
             # SUCCESS → next child
             self.index += 1
 
         # Finished sequence
         self.index = 0
-        return self._finish_tick(NodeState.SUCCESS, start)
+        return self._finish_tick(_S_SUCCESS, start)
 
 
 class Selector(Node):
+    __slots__ = ("children",)
+
     def __init__(self, name: str, children: Optional[List[Node]] = None) -> None:
         super().__init__(name)
-        self.children: List[Node] = children or []
+        # frozen: the structure is static once built (see BehaviorTree.compile)
+        self.children: Tuple[Node, ...] = tuple(children) if children else ()
 
     def tick(self) -> NodeState:
-        start = time.perf_counter()
+        start = Node._last_ts
         for child in self.children:
             state = child.tick()
 
-            if state == NodeState.RUNNING:
-                return self._finish_tick(NodeState.RUNNING, start)
+            if state == _S_RUNNING:
+                return self._finish_tick(_S_RUNNING, start)
 
-            if state == NodeState.SUCCESS:
-                return self._finish_tick(NodeState.SUCCESS, start)
+            if state == _S_SUCCESS:
+                return self._finish_tick(_S_SUCCESS, start)
 
-        return self._finish_tick(NodeState.FAILURE, start)
+        return self._finish_tick(_S_FAILURE, start)
 
 
 # =============================================================
@@ -121,6 +208,8 @@ class Selector(Node):
 # =============================================================
 
 class Condition(Node):
+    __slots__ = ()
+
     def __init__(self, name: str = "Condition") -> None:
         super().__init__(name)
 
@@ -129,13 +218,14 @@ class Condition(Node):
         raise NotImplementedError
 
     def tick(self) -> NodeState:
-        start = time.perf_counter()
         result = self.condition()
-        state = NodeState.SUCCESS if result else NodeState.FAILURE
-        return self._finish_tick(state, start)
+        state = _S_SUCCESS if result else _S_FAILURE
+        return self._finish_tick(state)
 
 
 class Action(Node):
+    __slots__ = ()
+
     def __init__(self, name: str = "Action") -> None:
         super().__init__(name)
 
@@ -144,12 +234,11 @@ class Action(Node):
         raise NotImplementedError
 
     def tick(self) -> NodeState:
-        start = time.perf_counter()
         state = self.action()
         if not isinstance(state, NodeState):
             # safety fallback
-            state = NodeState.FAILURE
-        return self._finish_tick(state, start)
+            state = _S_FAILURE
+        return self._finish_tick(state)
 
 
 # =============================================================
@@ -159,6 +248,8 @@ class Action(Node):
 # =============================================================
 
 class DummyCondition(Condition):
+    __slots__ = ("default_result",)
+
     def __init__(self, name: str, default_result: bool = True) -> None:
         super().__init__(name)
         self.default_result = default_result
@@ -169,6 +260,8 @@ class DummyCondition(Condition):
 
 
 class DummyAction(Action):
+    __slots__ = ("default_state",)
+
     def __init__(self, name: str, default_state: NodeState = NodeState.SUCCESS) -> None:
         super().__init__(name)
         self.default_state = default_state
@@ -259,6 +352,247 @@ def BuildBehaviorTree() -> Node:
     return root
 
 
+# =============================================================
+#   COMPILED PROGRAM
+#   The tree is static after BuildBehaviorTree, so BehaviorTree
+#   flattens it once into parallel per-instruction arrays and
+#   ticks it with a single loop instead of recursing through
+#   Node.tick(). Node objects still receive every state/timing
+#   update, so the viewer reads them exactly as before.
+#
+#   _run_program is the tree's single-threaded scheduler: every
+#   node runs on the caller's (UI) thread, in order, inside one
+#   loop. A future Parallel composite belongs here too, as its
+#   own ENTER/EXIT opcodes that tick each child in turn and count
+#   pending RUNNING children; never as a thread per child.
+# =============================================================
+
+# Opcodes. ENTER/EXIT bracket a composite's children. Every op that
+# finishes a node also carries its parent's kind, so the parent's
+# continue/stop decision runs in the same loop iteration.
+_OP_SEQ_ENTER = 0
+_OP_SEL_ENTER = 1
+_OP_CONDITION = 2
+_OP_ACTION = 3
+_OP_SEQ_EXIT = 4
+_OP_SEL_EXIT = 5
+_OP_CALL = 6        # node overrides tick() or _finish_tick(): call it as a black box
+
+# Parent kinds
+_IN_ROOT = 0
+_IN_SEQUENCE = 1
+_IN_SELECTOR = 2
+
+
+def _no_leaf() -> None:
+    """fns entry of ops that call no leaf; never called."""
+
+
+class _Program:
+    """Flat instruction arrays for one tree (Structure-of-Arrays)."""
+
+    __slots__ = ("ops", "parent_kind", "targets", "nodes", "parents", "fns", "resume", "starts")
+
+    def __init__(self) -> None:
+        self.ops = array("B")                               # opcode
+        self.parent_kind = array("B")                       # _IN_* of the node the op finishes
+        self.targets = array("I")                           # parent's EXIT pc
+        self.nodes: List[Node] = []                         # node the op belongs to
+        self.parents: List[Optional[Node]] = []             # that node's parent
+        self.fns: List[Callable[[], Any]] = []              # leaf callable
+        self.resume: List[Tuple[int, ...]] = []             # SEQ_ENTER: pc per child index
+        self.starts: List[float] = []                       # work stack reused by every tick
+
+    def emit(self, op: int, node: Node, fn: Callable[[], Any] = _no_leaf) -> int:
+        self.ops.append(op)
+        self.parent_kind.append(_IN_ROOT)
+        self.targets.append(0)
+        self.nodes.append(node)
+        self.parents.append(None)
+        self.fns.append(fn)
+        self.resume.append(())
+        return len(self.ops) - 1
+
+
+def _compile_tree(root: Node) -> _Program:
+    program = _Program()
+    emit = program.emit
+    ops = program.ops
+
+    # Explicit stack of open composites:
+    # [node, kind, enter_pc, child entry pcs, child finisher pcs, next child]
+    frames = []
+    pending: Optional[Node] = root
+    while True:
+        if pending is not None:
+            node, pending = pending, None
+            tick = type(node).tick
+            if type(node)._finish_tick is not Node._finish_tick:
+                # The loop inlines Node._finish_tick, so a node that overrides
+                # it only sees its own hook when ticked through node.tick()
+                tick = None
+            if tick is Sequence.tick or tick is Selector.tick:
+                if tick is Sequence.tick:
+                    kind, op = _IN_SEQUENCE, _OP_SEQ_ENTER
+                else:
+                    kind, op = _IN_SELECTOR, _OP_SEL_ENTER
+                frames.append([node, kind, emit(op, node), [], [], 0])
+                continue
+            if tick is Condition.tick:
+                finisher = emit(_OP_CONDITION, node, cast(Condition, node).condition)
+            elif tick is Action.tick:
+                finisher = emit(_OP_ACTION, node, cast(Action, node).action)
+            else:
+                finisher = emit(_OP_CALL, node, node.tick)
+        else:
+            frame = frames[-1]
+            node, kind, enter, starts, finishers, i = frame
+            if i < len(node.children):
+                frame[5] = i + 1
+                starts.append(len(ops))
+                pending = node.children[i]
+                continue
+
+            # All children emitted: close the composite
+            if kind == _IN_SEQUENCE:
+                finisher = emit(_OP_SEQ_EXIT, node)
+            else:
+                finisher = emit(_OP_SEL_EXIT, node)
+            for pc in finishers:
+                program.parent_kind[pc] = kind
+                program.targets[pc] = finisher
+                program.parents[pc] = node
+            if kind == _IN_SEQUENCE:
+                # resume[index] is where a Sequence continues from node.index;
+                # index == len(children) lands on EXIT.
+                starts.append(finisher)
+                program.resume[enter] = tuple(starts)
+            frames.pop()
+
+        if not frames:
+            return program
+        frames[-1][4].append(finisher)
+
+
+def _run_program(program: _Program) -> NodeState:
+    """
+    Tick a compiled tree once. Mirrors Sequence/Selector/Condition/
+    Action.tick exactly, including the Sequence resume index and the
+    order nodes are registered as executed.
+    """
+    ops = program.ops
+    parent_kind = program.parent_kind
+    targets = program.targets
+    nodes = program.nodes
+    parents = program.parents
+    fns = program.fns
+    resume = program.resume
+    clock = _TICK_CLOCK
+    profiling = Node.profiling
+    executed = _EXECUTED
+    # Explicit work stack of open composites' entry timestamps (see
+    # Node._finish_tick); its depth is the current tree depth, so deep
+    # trees never touch the interpreter's recursion limit.
+    starts = program.starts
+    starts.clear()  # a leaf that raised last tick may have left entries
+    last_ts = Node._last_ts
+
+    acc = None      # state returned by the most recently finished node
+    pc = 0
+    end = len(ops)
+    while pc < end:
+        op = ops[pc]
+        if op == _OP_SEQ_ENTER:
+            starts.append(last_ts)
+            acc = _S_SUCCESS
+            index = cast(Sequence, nodes[pc]).index
+            pc = resume[pc][index] if index else pc + 1
+            continue
+        if op == _OP_SEL_ENTER:
+            starts.append(last_ts)
+            acc = _S_FAILURE
+            pc += 1
+            continue
+
+        # Timing is delta accounting on one running timestamp: a leaf is
+        # charged the time since the previous finish and samples the clock,
+        # a composite spans its entry mark up to its last child's finish and
+        # samples nothing. Opaque calls sample once afterwards so spans that
+        # contain them stay correct. With Node.profiling off nothing is
+        # sampled or written.
+        node = nodes[pc]
+        if op == _OP_CALL:
+            Node._last_ts = last_ts
+            acc = fns[pc]()
+            if profiling:
+                last_ts = clock()
+        else:
+            if op == _OP_ACTION:
+                acc = fns[pc]()
+                if not isinstance(acc, NodeState):
+                    # safety fallback
+                    acc = _S_FAILURE
+                start = last_ts
+                if profiling:
+                    last_ts = clock()
+            elif op == _OP_CONDITION:
+                acc = _S_SUCCESS if fns[pc]() else _S_FAILURE
+                start = last_ts
+                if profiling:
+                    last_ts = clock()
+            elif op == _OP_SEQ_EXIT:
+                if acc != _S_RUNNING:
+                    cast(Sequence, node).index = 0
+                start = starts.pop()
+            else:  # _OP_SEL_EXIT
+                start = starts.pop()
+
+            # Inlined Node._finish_tick / _register_executed
+            node.last_state = acc
+            if profiling:
+                node.last_duration_ms = duration = (last_ts - start) * 1000.0
+                node.accumulated_ms += duration
+            node.is_active_path = True
+            executed.append(node)
+            node.exec_index = len(executed)
+
+        # Parent's decision after this child finished. acc is reassigned to
+        # the member it was just compared with: an opaque call may return a
+        # plain int, bool or None, and the parent must finish with the
+        # NodeState member itself (anything else counts as the fallthrough).
+        kind = parent_kind[pc]
+        if kind == _IN_SEQUENCE:
+            if acc == _S_RUNNING:
+                acc = _S_RUNNING
+                pc = targets[pc]
+            elif acc == _S_FAILURE:
+                acc = _S_FAILURE
+                pc = targets[pc]
+            else:
+                # SUCCESS → next child
+                acc = _S_SUCCESS
+                cast(Sequence, parents[pc]).index += 1
+                pc += 1
+        elif kind == _IN_SELECTOR:
+            if acc == _S_RUNNING:
+                acc = _S_RUNNING
+                pc = targets[pc]
+            elif acc == _S_SUCCESS:
+                acc = _S_SUCCESS
+                pc = targets[pc]
+            else:
+                acc = _S_FAILURE
+                pc += 1
+        else:
+            pc += 1
+
+    Node._last_ts = last_ts
+    if not isinstance(acc, NodeState):
+        # an opaque root returned a non-NodeState: same fallback as Action
+        return _S_FAILURE
+    return acc
+
+
 # =============================================================
 #   GLOBAL ROOT + Wrapper (used by BTStandalone)
 # =============================================================
@@ -267,19 +601,60 @@ BT_ROOT: Node = BuildBehaviorTree()
 
 
 class BehaviorTree:
+    # Tree whose nodes _EXECUTED currently holds
+    _last_ticked: Optional["BehaviorTree"] = None
+
     def __init__(self) -> None:
         self.root: Node = BT_ROOT
+        self._program: Optional[_Program] = None
+        self._program_root: Optional[Node] = None
+        # Executed nodes are copied out of the shared list only when asked
+        # for, while it still holds this tree's tick (see tick())
+        self._tick_serial: int = -1
+        self._executed_nodes_last_tick: List[Node] = []
+        self._executed_copied = True
+
+    def compile(self) -> None:
+        """
+        Flatten self.root into the program run by tick(). Done lazily on
+        the first tick after root is (re)assigned; call it again after
+        changing the children of a node already in the tree.
+        """
+        self._program = _compile_tree(self.root)
+        self._program_root = self.root
 
     def tick(self) -> NodeState:
-        Node.begin_new_tick()  # Start of tick: reset tracking
+        # _EXECUTED is about to be reset: a different tree that ticked last
+        # and hasn't copied its nodes out yet gets its copy now
+        prev = BehaviorTree._last_ticked
+        if prev is not self:
+            if prev is not None:
+                prev.GetExecutedNodesLastTick()
+            BehaviorTree._last_ticked = self
+
+        _begin_new_tick()  # Start of tick: reset tracking
+        self._tick_serial = Node.tick_serial
+        self._executed_copied = False
         if self.root:
-            result = self.root.tick()
-            self._executed_nodes_last_tick = Node.get_executed_nodes_last_tick()
-            return result
-        self._executed_nodes_last_tick = []
+            if self._program_root is not self.root:
+                self.compile()
+            assert self._program is not None
+            return _run_program(self._program)
         return NodeState.FAILURE
 
-    def GetExecutedNodesLastTick(self):
+    def GetExecutedNodesLastTick(self) -> List[Node]:
+        """
+        Nodes finished by this tree's most recent tick, in execution order.
+        The copy out of the shared list is made on the first call after the
+        tick, or by the next tick of another tree, whichever comes first.
+        """
+        if not self._executed_copied:
+            if Node.tick_serial == self._tick_serial:
+                self._executed_nodes_last_tick = list(_EXECUTED)
+            else:
+                # reset by a direct Node.begin_new_tick(): nothing left of ours
+                self._executed_nodes_last_tick = []
+            self._executed_copied = True
         return self._executed_nodes_last_tick
 
 